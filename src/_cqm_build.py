@@ -0,0 +1,41 @@
+"""
+Vectorized coefficient builders for the Big-M constraint families of
+EnterpriseSolver.build_model.
+
+Each builder returns one NumPy row per constraint; the solver zips the rows with
+variable labels and streams them into the CQM, so the per-constraint arithmetic
+happens in array operations instead of the emission loop.
+"""
+import numpy as np
+
+
+def containment_rows(item_dims: np.ndarray, bin_dims: np.ndarray, upper: np.ndarray,
+                     item_idx: np.ndarray, bin_idx: np.ndarray) -> np.ndarray:
+    """
+    C3 bin_loc coefficients, shape (P, 3), for the (item, bin) pairs
+    (item_idx[p], bin_idx[p]) and the axes x, y, z:
+
+        coord_i + M * bin_loc[i, j] <= U,   M = U + min(ext_i, bin_ext_j) - bin_ext_j
+
+    The pairs must fit in real units; an extent that exceeds the bin only through
+    rounding is clamped, which pins the item to coordinate 0 on that axis.
+    """
+    ext = np.minimum(item_dims[item_idx], bin_dims[bin_idx])
+    return upper[None, :] + ext - bin_dims[bin_idx]
+
+
+def separation_rows(item_dims: np.ndarray, upper: np.ndarray,
+                    I: np.ndarray, K: np.ndarray) -> np.ndarray:
+    """
+    C4 selector coefficients, shape (P, 6), for the pairs (I[p], K[p]) and the
+    directions d = 0..5 (left, right, behind, front, below, above):
+
+        coord_a - coord_b + M * sel <= U,   M = U + ext_a
+
+    where a is the item on the low side of the separating plane (i for even d,
+    k for odd d).
+    """
+    rows = np.empty((len(I), 6), dtype=np.int64)
+    rows[:, 0::2] = upper[None, :] + item_dims[I]
+    rows[:, 1::2] = upper[None, :] + item_dims[K]
+    return rows
@@ -1,55 +1,155 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Tuple
-from enum import Enum
+from dataclasses import dataclass, fields
+from functools import cached_property
+import numpy as np
+from pydantic import BaseModel, ConfigDict, model_validator
+from typing import Any, Dict, Literal, NamedTuple, Optional, Tuple
 
-class Priority(str, Enum):
-    HIGH = "high"
-    MEDIUM = "medium"
-    LOW = "low"
+# Item priority: plain string literal, no enum validator on the hot path
+Priority = Literal["high", "medium", "low"]
 
-class Dimensions(BaseModel):
-    length: float = Field(..., gt=0, description="Length in meters")
-    width: float = Field(..., gt=0, description="Width in meters")
-    height: float = Field(..., gt=0, description="Height in meters")
+
+def _known_fields(names, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of `data` with only the keys in `names`: pydantic's extra='ignore' for
+    the JSON entry points.
+    """
+    return {k: v for k, v in data.items() if k in names}
+
+
+def _require_positive(obj, *names: str) -> None:
+    """
+    Hand-written replacement for Pydantic's Field(..., gt=0).
+    """
+    for name in names:
+        if not getattr(obj, name) > 0:
+            raise ValueError(f"{type(obj).__name__}.{name} must be > 0")
+
+
+class Dimensions(NamedTuple):
+    """
+    Plain (length, width, height) tuple. Positivity is checked once per request
+    (see PackingRequest), not per instance.
+    """
+    length: float  # Length in meters
+    width: float   # Width in meters
+    height: float  # Height in meters
 
     @property
     def volume(self) -> float:
         return self.length * self.width * self.height
 
-class Item(BaseModel):
+
+@dataclass(slots=True, frozen=True)
+class Item:
     """
     Represents a cargo item to be packed.
     """
     id: str
     dims: Dimensions
-    weight: float = Field(..., gt=0, description="Weight in kg")
-    
+    weight: float  # Weight in kg
+
     # Constraints
-    max_stack_weight: Optional[float] = Field(None, description="Max weight that can be placed on top of this item")
-    is_fragile: bool = Field(False, description="If True, nothing heavy can be stacked on it")
-    priority: Priority = Priority.MEDIUM
-    
+    max_stack_weight: Optional[float] = None  # Max weight that can be placed on top of this item
+    is_fragile: bool = False  # If True, nothing heavy can be stacked on it
+    priority: Priority = "medium"
+
     # Orientation: (can_rotate_xy, can_rotate_yz, can_rotate_xz) - simplified for now
-    allowed_orientations: List[Tuple[int, int, int]] = Field(default_factory=lambda: [(0,0,0)])
+    allowed_orientations: Tuple[Tuple[int, int, int], ...] = ((0, 0, 0),)
 
-class Bin(BaseModel):
+    def __post_init__(self):
+        _require_positive(self, "weight")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Item":
+        """
+        Builds an Item from a JSON payload (API layer entry point). Unknown keys
+        are ignored.
+        """
+        data = _known_fields({f.name for f in fields(cls)}, data)
+        data["dims"] = Dimensions(**_known_fields(Dimensions._fields, data["dims"]))
+        if "allowed_orientations" in data:
+            data["allowed_orientations"] = tuple(tuple(o) for o in data["allowed_orientations"])
+        return cls(**data)
+
+
+@dataclass(slots=True, frozen=True)
+class Bin:
     """
     Represents a container or truck.
     """
     id: str
     dims: Dimensions
-    max_weight: float = Field(..., gt=0, description="Max payload capacity in kg")
-    
+    max_weight: float  # Max payload capacity in kg
+
     # Advanced Logistics (Day 4)
-    axle_max_weight: Optional[float] = Field(None, description="Max weight per axle (Front/Rear)")
-    wheelbase: Optional[float] = Field(None, description="Distance between front and rear axles")
-    center_of_gravity_target: Optional[Tuple[float, float]] = Field(None, description="Target (x, y) CoG")
-    cog_tolerance: Optional[float] = Field(None, description="Allowed deviation from CoG target")
-    
+    axle_max_weight: Optional[float] = None  # Max weight per axle (Front/Rear)
+    wheelbase: Optional[float] = None  # Distance between front and rear axles
+    center_of_gravity_target: Optional[Tuple[float, float]] = None  # Target (x, y) CoG
+    cog_tolerance: Optional[float] = None  # Allowed deviation from CoG target
+
     # Future: Axle constraints
     # axle_weights: Optional[List[float]] = None
 
+    def __post_init__(self):
+        _require_positive(self, "max_weight")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Bin":
+        """
+        Builds a Bin from a JSON payload (API layer entry point). Unknown keys
+        are ignored.
+        """
+        data = _known_fields({f.name for f in fields(cls)}, data)
+        data["dims"] = Dimensions(**_known_fields(Dimensions._fields, data["dims"]))
+        if data.get("center_of_gravity_target") is not None:
+            data["center_of_gravity_target"] = tuple(data["center_of_gravity_target"])
+        return cls(**data)
+
+
 class PackingRequest(BaseModel):
-    items: List[Item]
-    bins: List[Bin]
+    # Immutable once validated (the cached arrays below rely on it): frozen fields,
+    # tuples of frozen dataclasses. Lists are accepted and stored as tuples.
+    model_config = ConfigDict(frozen=True)
+
+    items: Tuple[Item, ...]
+    bins: Tuple[Bin, ...]
     time_limit_seconds: int = 20
+
+    @model_validator(mode="after")
+    def _check_dimensions(self) -> "PackingRequest":
+        """
+        All item and bin extents must be > 0: one vectorized check per request
+        instead of a validator call per Dimensions instance.
+        """
+        for kind, objs, dims in (("Item", self.items, self.item_dims_array),
+                                 ("Bin", self.bins, self.bin_dims_array)):
+            bad = np.flatnonzero(~np.all(dims > 0, axis=1))
+            if bad.size:
+                raise ValueError(f"{kind} '{objs[bad[0]].id}' dimensions must be > 0")
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Compares the model fields only: BaseModel.__eq__ compares __dict__, which
+        also holds the cached arrays below (ndarray == is elementwise, not a bool).
+        """
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in type(self).model_fields)
+
+    # Cached per request: the solver reads these on every build_model call
+    @cached_property
+    def item_dims_array(self) -> np.ndarray:
+        """
+        (N, 3) array of item (length, width, height) in meters.
+        """
+        return np.array([(it.dims.length, it.dims.width, it.dims.height) for it in self.items],
+                        dtype=np.float64).reshape(-1, 3)
+
+    @cached_property
+    def bin_dims_array(self) -> np.ndarray:
+        """
+        (M, 3) array of bin (length, width, height) in meters.
+        """
+        return np.array([(b.dims.length, b.dims.width, b.dims.height) for b in self.bins],
+                        dtype=np.float64).reshape(-1, 3)
@@ -1,281 +1,831 @@
-from dimod import ConstrainedQuadraticModel, Binary, Real, quicksum
+import asyncio
+import logging
+import threading
+import uuid
+import numpy as np
+from dimod import ConstrainedQuadraticModel, QuadraticModel, SampleSet
 from dwave.system import LeapHybridCQMSampler
 from typing import List, Tuple, Dict, Optional
-from itertools import combinations
 from .domain_models import Item, Bin, PackingRequest
+from ._cqm_build import containment_rows, separation_rows
+
+logger = logging.getLogger(__name__)
+
+_CONTAIN_NAMES = ("contain_x", "contain_y", "contain_z")
+
+# Non-overlap directions d = 0..5 as (label, axis, k_first): the row reads
+# coord_a + ext_a <= coord_b with (a, b) = (k, i) if k_first else (i, k).
+_SEPARATIONS = (
+    ("sep_left", 0, False),    # d=0: i left of k => x_i + len_i <= x_k
+    ("sep_right", 0, True),    # d=1: i right of k => x_k + len_k <= x_i
+    ("sep_behind", 1, False),  # d=2: i behind k => y_i + wid_i <= y_k
+    ("sep_front", 1, True),    # d=3: i front of k => y_k + wid_k <= y_i
+    ("sep_below", 2, False),   # d=4: i below k => z_i + hgt_i <= z_k
+    ("sep_above", 2, True),    # d=5: i above k => z_k + hgt_k <= z_i
+)
+
+# Bin-order directions d = 6, 7 as (label, k_first): i in an earlier / later bin
+# than k, compared on the bin index. Used instead of one separation row per shared
+# bin once a pair shares more than _MAX_SHARED_ROWS bins.
+_BIN_ORDERS = (
+    ("sep_bin_before", False),  # d=6: bin_i < bin_k
+    ("sep_bin_after", True),    # d=7: bin_k < bin_i
+)
+_MAX_SHARED_ROWS = 3
+
+
+def _upper_bound_bins(item_dims: np.ndarray, weights: np.ndarray, bin_dims: np.ndarray,
+                      bin_caps: np.ndarray, fits: Optional[np.ndarray] = None,
+                      ) -> Tuple[int, Optional[List[Tuple[int, Tuple[int, int, int]]]]]:
+    """
+    Classical First-Fit-Decreasing pre-pass on grid units.
+
+    `item_dims` / `bin_dims` are (N, 3) / (M, 3) arrays of (length, width, height).
+    `fits[i, j]` tells whether item i fits bin j on its own (default: on the grid
+    extents). An item that fits a bin although its rounded-up extent exceeds the
+    bin's rounded-down one is placed as filling that axis (see C3).
+
+    Items are taken by decreasing volume and placed into the first bin (in request
+    order) that still has weight capacity and room on a simple shelf layout
+    (rows along x, rows stacked along y, layers along z). Because the shelf layout
+    is a real non-overlapping packing, the number of bins it opens is an upper
+    bound on how many bins an optimal packing needs, though not on which ones
+    (balance and stackability rules are not considered).
+
+    Returns (M_hat, placement) where placement[i] = (bin index, (x, y, z) corner).
+    If some item cannot be placed, returns (len(bins), None); with no items, (0, []).
+    """
+    num_items, num_bins = len(item_dims), len(bin_dims)
+    if num_items == 0:
+        return 0, []
+    if fits is None:
+        fits = np.all(item_dims[:, None, :] <= bin_dims[None, :, :], axis=2)
+    fits = fits.tolist()
+    volumes = item_dims.prod(axis=1)
+    # Stable sort keeps identical items in index order
+    order = np.argsort(-volumes, kind="stable").tolist()
+    item_dims, weights = item_dims.tolist(), weights.tolist()
+    boxes, bin_caps = bin_dims.tolist(), bin_caps.tolist()
+    # Per-bin shelf state: [x, y, z, row_width, layer_height, load]
+    state = [[0, 0, 0, 0, 0, 0.0] for _ in range(num_bins)]
+    placement: List[Optional[Tuple[int, Tuple[int, int, int]]]] = [None] * num_items
+
+    for i in order:
+        for j in range(num_bins):
+            st = state[j]
+            if not fits[i][j] or st[5] + weights[i] > bin_caps[j]:
+                continue
+            length, width, height = map(min, item_dims[i], boxes[j])
+            corner = _shelf_place(st, length, width, height, boxes[j])
+            if corner is not None:
+                st[5] += weights[i]
+                placement[i] = (j, corner)
+                break
+        else:
+            return num_bins, None
+
+    return max(j for j, _ in placement) + 1, placement
+
+
+def _shelf_place(st: List, length: int, width: int, height: int, box: List[int]) -> Optional[Tuple[int, int, int]]:
+    """
+    Places an item on the shelf layout `st` of a bin with dimensions `box`
+    (length, width, height), advancing the cursor. Returns the item's corner
+    or None if it does not fit.
+    """
+    box_l, box_w, box_h = box
+    x, y, z, row_w, layer_h, _ = st
+    if x + length > box_l or y + width > box_w or z + height > box_h:
+        # Start a new row in the current layer
+        x, y = 0, y + row_w
+        row_w = 0
+        if length > box_l or y + width > box_w or z + height > box_h:
+            # Start a new layer
+            x, y, z = 0, 0, z + layer_h
+            layer_h = 0
+            if length > box_l or width > box_w or z + height > box_h:
+                return None
+    st[0], st[1], st[2] = x + length, y, z
+    st[3], st[4] = max(row_w, width), max(layer_h, height)
+    return (x, y, z)
+
+
+def _order_copies(placement: List[Tuple[int, Tuple[int, int, int]]],
+                  groups: Dict[tuple, List[int]]) -> List[Tuple[int, Tuple[int, int, int]]]:
+    """
+    Hands each group of identical copies its placements in (z, y, x) corner order,
+    so a placement satisfies the C4b copy ordering. Copies are interchangeable, so
+    the packing itself is unchanged.
+    """
+    placement = list(placement)
+    for members in groups.values():
+        spots = sorted((placement[i] for i in members), key=lambda p: p[1][::-1])
+        for i, spot in zip(members, spots):
+            placement[i] = spot
+    return placement
+
+
+def _to_grid(dims, step: float, up: bool) -> np.ndarray:
+    """
+    Converts an (N, 3) list of sizes in meters to integer step counts,
+    rounding up (item extents) or down (bin extents). The small slack absorbs
+    float noise such as 0.15 / 0.05 = 2.9999999999999996.
+    """
+    scaled = np.asarray(dims, dtype=np.float64).reshape(-1, 3) / step
+    grid = np.ceil(scaled - 1e-9) if up else np.floor(scaled + 1e-9)
+    return grid.astype(np.int64)
+
+
+def _bin_spec(b: Bin) -> tuple:
+    """
+    Everything about a bin but its id, as a hashable key: bins with equal specs
+    are interchangeable for the model.
+    """
+    cog = b.center_of_gravity_target
+    return (tuple(b.dims), b.max_weight, b.axle_max_weight, b.wheelbase,
+            None if cog is None else tuple(cog), b.cog_tolerance)
+
+
+def _sources(sampleset: SampleSet) -> List[str]:
+    """
+    Per-row source of a sampleset from _sample: "leap", or "ffd" for the appended
+    warm start (no such row without a warm start).
+    """
+    if "source" in sampleset.record.dtype.names:
+        return sampleset.record.source.tolist()
+    return ["leap"] * len(sampleset)
+
 
 class EnterpriseSolver:
     """
     CQM Solver for 3D Bin Packing with Enterprise Constraints.
     Includes: Weight, Geometry (Non-overlap), Stackability (Fragility/Load Bearing).
+
+    Constraints are assembled at the bias level: every variable is declared once,
+    and each constraint is streamed into the CQM as (label, bias) tuples instead
+    of being built up through dimod's expression arithmetic.
     """
-    def __init__(self, time_limit: int = 20):
+    # Grid resolution in meters: coordinates are integers counting grid steps
+    STEP = 0.05
+
+    # One Leap client per process: creating it costs a SAPI handshake + solver listing
+    _sampler: Optional[LeapHybridCQMSampler] = None
+    _sampler_lock = threading.Lock()
+
+    def __init__(self, time_limit: int = 20, stop_on_first: bool = False):
         self.time_limit = time_limit
+        # Satisfiability runs: ask Leap for its minimum run time for the model
+        # instead of time_limit (the hybrid solver has no stop-at-first-feasible)
+        self.stop_on_first = stop_on_first
+        self.reset()
+
+    def reset(self):
+        """
+        Starts a fresh, empty model so the solver can be reused for another request
+        (the shared Leap client is kept).
+        """
         self.cqm = ConstrainedQuadraticModel()
-        self.sampler = LeapHybridCQMSampler()
+        # Grid step (m) of every integer coordinate label built so far (for decoding)
+        self._coord_step: Dict[str, float] = {}
+        # FFD packing of every request built so far, as a CQM sample (None if FFD failed)
+        self._warm_start: Optional[Dict[str, int]] = {}
+
+    @classmethod
+    def _get_sampler(cls) -> LeapHybridCQMSampler:
+        """
+        Returns the shared sampler, creating it on first use (double-checked lock).
+        """
+        sampler = cls._sampler
+        if sampler is None:
+            with cls._sampler_lock:
+                sampler = cls._sampler
+                if sampler is None:
+                    sampler = cls._sampler = LeapHybridCQMSampler()
+        return sampler
+
+    @property
+    def sampler(self) -> LeapHybridCQMSampler:
+        return self._get_sampler()
 
     def build_model(self, request: PackingRequest):
         """
         Builds the CQM model from the request.
         """
+        self.cqm.set_objective(self._build_for_prefix("", request))
+
+    def _build_for_prefix(self, prefix: str, request: PackingRequest) -> List[Tuple[str, float]]:
+        """
+        Adds the variables and constraints of one request to self.cqm, with every
+        variable and constraint label prefixed by `prefix`. Returns the request's
+        objective terms (the caller sets the objective).
+        """
         items = request.items
         bins = request.bins
         num_items = len(items)
-        num_bins = len(bins)
+        cqm = self.cqm
+
+        # Hoist the numeric attributes read in the emission loops (one attribute
+        # lookup per item instead of one per emitted term).
+        # Geometry is quantized to the STEP grid: item extents round up and bin
+        # extents round down, so every grid packing is a valid real packing.
+        step = self.STEP
+        item_dims = _to_grid(request.item_dims_array, step, up=True)
+        bin_dims = _to_grid(request.bin_dims_array, step, up=False)
+        L, W, _ = item_dims.T
+        wt = np.array([it.weight for it in items], dtype=np.float64)
+        frag = np.array([it.is_fragile for it in items], dtype=bool)
+        msw = np.array(
+            [it.max_stack_weight if it.max_stack_weight is not None else np.nan for it in items],
+            dtype=np.float64,
+        )
+        bin_cap = np.array([b.max_weight for b in bins], dtype=np.float64)
+
+        # (item, bin) pairs where the item physically fits the bin on its own, tested
+        # in meters: an exact fit (pallet as wide as the van) loses a step to the
+        # rounding and is kept through the clamped containment rows of C3.
+        # Infeasible pairs never get a bin_loc variable or containment constraints.
+        fits = (
+            np.all(request.item_dims_array[:, None, :] <= request.bin_dims_array[None, :, :] + 1e-9, axis=2)
+            & (wt[:, None] <= bin_cap[None, :])
+        )
+        feasible = [tuple(pair) for pair in np.argwhere(fits).tolist()]
+        fits_somewhere = {i for i, _ in feasible}
+        for i in range(num_items):
+            if i not in fits_somewhere:
+                raise ValueError(f"Item '{items[i].id}' does not fit in any bin")
+
+        # FFD packs everything into M_hat bins, so an optimal packing needs at most
+        # M_hat bins, though not necessarily the ones FFD used. Only bins beyond the
+        # first M_hat of one spec can be dropped: a packing using them can swap to an
+        # identical kept bin. Bins keep their request index.
+        # FFD ignores stackability and balance, so if any of those rules applies its
+        # packing may be infeasible and every bin is kept.
+        M_hat, placement = _upper_bound_bins(item_dims, wt, bin_dims, bin_cap, fits)
+        has_rules = (
+            frag.any()
+            or not np.isnan(msw).all()
+            or any((b.center_of_gravity_target and b.cog_tolerance) or (b.wheelbase and b.axle_max_weight)
+                   for b in bins)
+        )
+        # kept bins, and the previous kept bin of the same spec (for C0)
+        kept, prev_same, last_of_spec = [], {}, {}
+        for j, b in enumerate(bins):
+            spec = _bin_spec(b)
+            count, last = last_of_spec.get(spec, (0, None))
+            if has_rules or count < M_hat:
+                kept.append(j)
+                if last is not None:
+                    prev_same[j] = last
+                last_of_spec[spec] = (count + 1, j)
+        in_kept = np.zeros(len(bins), dtype=bool)
+        in_kept[kept] = True
+        fits &= in_kept[None, :]
+        feasible = [tuple(pair) for pair in np.argwhere(fits).tolist()]
+        self.feasible = feasible
+        item_bins = {i: [] for i in range(num_items)}
+        bin_items = {j: [] for j in kept}
+        for i, j in feasible:
+            item_bins[i].append(j)
+            bin_items[j].append(i)
+
+        # Pairs (i < k) that can share a bin, as two index arrays materialized once:
+        # only they need non-overlap selectors. shared[p] lists their common bins.
+        I, K = np.nonzero(np.triu(fits.astype(np.int64) @ fits.T.astype(np.int64), k=1))
+        self.pairs = list(zip(I.tolist(), K.tolist()))
+        shared = [np.flatnonzero(row).tolist() for row in fits[I] & fits[K]]
+        by_bin_order = [len(common) > _MAX_SHARED_ROWS for common in shared]
+
+        # Identical copies: same grid dims, weight and stackability. Copies are
+        # interchangeable, so they are kept in index order by their (z, y, x) corner
+        # (see C4b); then i < k is never above k in a shared bin and that selector is
+        # not needed.
+        groups = {}
+        for i, it in enumerate(items):
+            key = (*item_dims[i].tolist(), it.weight, it.is_fragile, it.max_stack_weight)
+            groups.setdefault(key, []).append(i)
+        group_of = np.empty(num_items, dtype=np.intp)
+        for g, members in enumerate(groups.values()):
+            group_of[members] = g
+        copies = group_of[I] == group_of[K]
+        if placement:
+            placement = _order_copies(placement, groups)
         
-        # Pre-calculate large constant M for Big-M constraints
-        # M should be larger than any possible dimension
-        max_bin_dim = max(max(b.dims.length, b.dims.width, b.dims.height) for b in bins)
-        M = max_bin_dim * 2
+        # Coordinate upper bounds per axis (grid units): the largest bin extent,
+        # one NumPy reduction over the bins kept. Big-M values below are derived
+        # per constraint from these bounds.
+        U_x, U_y, U_z = bin_dims[kept].max(axis=0, initial=0).tolist()
 
         # --- Variables ---
         
         # 1. Assignment: bin_loc[i, j] = 1 if item i is in bin j
         self.bin_loc = {
-            (i, j): Binary(f"item_{i}_in_bin_{j}")
-            for i in range(num_items)
-            for j in range(num_bins)
+            (i, j): f"{prefix}item_{i}_in_bin_{j}"
+            for i, j in feasible
         }
+        cqm.add_variables('BINARY', list(self.bin_loc.values()))
         
         # 2. Bin Usage: bin_on[j] = 1 if bin j is used
         self.bin_on = {
-            j: Binary(f"bin_{j}_used")
-            for j in range(num_bins)
+            j: f"{prefix}bin_{j}_used"
+            for j in kept
         }
+        cqm.add_variables('BINARY', list(self.bin_on.values()))
         
-        # 3. Coordinates: x, y, z for each item
-        self.x = {i: Real(f"x_{i}", lower_bound=0, upper_bound=max_bin_dim) for i in range(num_items)}
-        self.y = {i: Real(f"y_{i}", lower_bound=0, upper_bound=max_bin_dim) for i in range(num_items)}
-        self.z = {i: Real(f"z_{i}", lower_bound=0, upper_bound=max_bin_dim) for i in range(num_items)}
+        # 3. Coordinates: x, y, z for each item, as integer multiples of the grid step
+        self.x = {i: f"{prefix}x_{i}" for i in range(num_items)}
+        self.y = {i: f"{prefix}y_{i}" for i in range(num_items)}
+        self.z = {i: f"{prefix}z_{i}" for i in range(num_items)}
+        for coord, upper in ((self.x, U_x), (self.y, U_y), (self.z, U_z)):
+            self._coord_step.update(dict.fromkeys(coord.values(), step))
+            cqm.add_variables('INTEGER', list(coord.values()), lower_bound=0, upper_bound=upper)
         
         # 4. Relative Position Selectors (for Non-Overlap)
         # b[i, k, d] = 1 if item i is relative to k in direction d
         # d=0: i left of k, 1: i right of k, 2: i behind k, 3: i front of k, 4: i below k, 5: i above k
+        # (copies: d=0..4 only, see above), 6: i in an earlier bin, 7: i in a later bin
+        # (only for pairs sharing many bins, see C4)
         self.selector = {}
-        for i, k in combinations(range(num_items), 2):
-            for d in range(6):
-                self.selector[(i, k, d)] = Binary(f"sel_{i}_{k}_{d}")
+        for (i, k), copy, order in zip(self.pairs, copies.tolist(), by_bin_order):
+            for d in (*range(5 if copy else 6), *((6, 7) if order else ())):
+                self.selector[(i, k, d)] = f"{prefix}sel_{i}_{k}_{d}"
+        cqm.add_variables('BINARY', list(self.selector.values()))
+
+        # 5. Copy counts: count[g, j] = number of copies of group g in bin j, for the
+        # groups with several copies fitting bin j. C2, C5 and C7 weigh such a group
+        # through one count term instead of one bin_loc term per copy.
+        # units[j] lists the (variable, item it stands for) terms of bin j.
+        self.groups = list(groups.values())
+        self.count = {}
+        units = {j: [] for j in kept}
+        for g, members in enumerate(self.groups):
+            for j in kept:
+                here = [i for i in members if fits[i, j]]
+                if len(here) > 1:
+                    self.count[g, j] = label = f"{prefix}count_{g}_in_bin_{j}"
+                    cqm.add_variable('INTEGER', label, lower_bound=0, upper_bound=len(here))
+                    units[j].append((label, here[0]))
+                else:
+                    units[j].extend((self.bin_loc[i, j], i) for i in here)
+
+        # Warm start: the FFD packing as a full assignment of the variables above
+        if placement is None:
+            self._warm_start = None
+        elif self._warm_start is not None:
+            self._warm_start.update(self._ffd_solution(placement, item_dims, I, K))
 
         # --- Constraints ---
+
+        # C0. Symmetry breaking: identical bins are used in request order
+        for j, prev in prev_same.items():
+            cqm.add_constraint_from_iterable(
+                ((self.bin_on[j], 1.0), (self.bin_on[prev], -1.0)), '<=', 0,
+                label=f"{prefix}bin_{j}_after_bin_{prev}"
+            )
         
         # C1. Every item must be in exactly one bin
         for i in range(num_items):
-            self.cqm.add_constraint(
-                quicksum(self.bin_loc[i, j] for j in range(num_bins)) == 1,
-                label=f"item_{i}_assigned_once"
+            cqm.add_constraint_from_iterable(
+                ((self.bin_loc[i, j], 1.0) for j in item_bins[i]), '==', 1,
+                label=f"{prefix}item_{i}_assigned_once"
             )
             
+        # C1b. Copy counts: count[g, j] = sum of bin_loc[i, j] over the copies i of g
+        for (g, j), label in self.count.items():
+            cqm.add_constraint_from_iterable(
+                [(self.bin_loc[i, j], 1.0) for i in self.groups[g] if fits[i, j]] + [(label, -1.0)], '==', 0,
+                label=(prefix, "copy_count", g, j)
+            )
+
         # C2. Bin Usage Link
-        for i in range(num_items):
-            for j in range(num_bins):
-                self.cqm.add_constraint(
-                    self.bin_loc[i, j] - self.bin_on[j] <= 0,
-                    label=f"link_item_{i}_bin_{j}"
-                )
+        # Aggregated per bin: sum_i bin_loc[i,j] <= N * bin_on[j] (copy counts in place
+        # of their bin_loc terms). Any item placed in bin j forces bin_on[j] = 1
+        # (M constraints instead of N*M)
+        for j in kept:
+            cqm.add_constraint_from_iterable(
+                [(v, 1.0) for v, _ in units[j]] + [(self.bin_on[j], -num_items)], '<=', 0,
+                label=f"{prefix}bin_{j}_activation"
+            )
 
         # C3. Geometric Boundaries (Containment)
-        for i in range(num_items):
-            for j in range(num_bins):
-                # If item i is in bin j, it must fit
-                # x_i + len_i <= bin_len_j + M(1 - bin_loc[i,j])
-                self.cqm.add_constraint(
-                    self.x[i] + items[i].dims.length - bins[j].dims.length <= M * (1 - self.bin_loc[i, j]),
-                    label=f"contain_x_{i}_{j}"
-                )
-                self.cqm.add_constraint(
-                    self.y[i] + items[i].dims.width - bins[j].dims.width <= M * (1 - self.bin_loc[i, j]),
-                    label=f"contain_y_{i}_{j}"
-                )
-                self.cqm.add_constraint(
-                    self.z[i] + items[i].dims.height - bins[j].dims.height <= M * (1 - self.bin_loc[i, j]),
-                    label=f"contain_z_{i}_{j}"
+        # The O(N*M) and O(N^2) constraint families (C3, C4, C6) are labelled with
+        # (prefix, name, index, index) tuples: hashable, serializable, and much
+        # cheaper to build than one formatted string per constraint.
+        # If item i is in bin j, it must fit
+        # x_i + len_i <= bin_len_j + M_ij(1 - bin_loc[i,j])
+        # Tight M_ij: with bin_loc = 0 the row must hold for any x_i <= U_x,
+        # so M_ij = U_x + len_i - bin_len_j, and the RHS collapses to U_x:
+        # => x_i + M_ij * bin_loc[i,j] <= U_x   (same for y, z)
+        # An item that fits in meters but is one step too long on the grid has len_i
+        # clamped to bin_len_j: it is pinned to x_i = 0, where it really fits.
+        # All coefficients come from one vectorized pass (see _cqm_build).
+        coords = (self.x, self.y, self.z)
+        upper = np.array([U_x, U_y, U_z], dtype=np.int64)
+        upper_list = upper.tolist()
+        fi, fj = np.asarray(feasible, dtype=np.intp).reshape(-1, 2).T
+        contain = containment_rows(item_dims, bin_dims, upper, fi, fj).tolist()
+        for ((i, j), loc), row in zip(self.bin_loc.items(), contain):
+            for axis, m in enumerate(row):
+                cqm.add_constraint_from_iterable(
+                    ((coords[axis][i], 1.0), (loc, m)), '<=', upper_list[axis],
+                    label=(prefix, _CONTAIN_NAMES[axis], i, j)
                 )
 
         # C4. Non-Overlap (The 3D Puzzle)
-        for i, k in combinations(range(num_items), 2):
+        # x_a + len_a <= x_b + M(1 - sel)  =>  x_a - x_b + M * sel <= M - len_a
+        # Tight M for the axis: x_a - x_b <= U, so M = U + len_a and the RHS is U.
+        separation = separation_rows(item_dims, upper, I, K).tolist()
+        # Bin index of an item: sum_j rank_j * bin_loc[i, j] over its bins (rank 0 dropped)
+        rank = {j: r for r, j in enumerate(kept)}
+        bin_index = {
+            i: [(self.bin_loc[i, j], float(rank[j])) for j in item_bins[i] if rank[j]]
+            for i in range(num_items)
+        }
+        for (i, k), row, copy, common, order in zip(self.pairs, separation, copies.tolist(), shared, by_bin_order):
+            row = row[:5] if copy else row
+            sels = [(self.selector[(i, k, d)], 1.0) for d in range(len(row))]
             # 1. Must be separated in at least one direction IF they are in the same bin
-            # We check if they are in the same bin: sum(bin_loc[i,j] * bin_loc[k,j])
-            # But that's quadratic. Simplified: Just enforce separation always? 
-            # No, if they are in different bins, they don't need to separate.
-            # Actually, if they are in different bins, coordinates don't matter relative to each other.
-            # So we can just enforce: sum(selector) >= 1 - M * (items_in_diff_bins)
-            # But simpler: sum(selector) >= 1. If they are in different bins, we can just pick "i left of k" arbitrarily.
-            self.cqm.add_constraint(
-                quicksum(self.selector[(i, k, d)] for d in range(6)) >= 1,
-                label=f"separation_required_{i}_{k}"
-            )
-            
+            if not order:
+                # Linear in the assignments, one row per shared bin j:
+                # sum(selector) >= bin_loc[i,j] + bin_loc[k,j] - 1
+                # In different bins the RHS is <= 0 and all selectors may stay 0.
+                for j in common:
+                    cqm.add_constraint_from_iterable(
+                        sels + [(self.bin_loc[i, j], -1.0), (self.bin_loc[k, j], -1.0)], '>=', -1,
+                        label=(prefix, "separation_required", i, k, j)
+                    )
+            else:
+                # Many shared bins: "different bin" becomes two more directions, so one
+                # covering row replaces the per-bin rows. With B_i the bin index,
+                # B_a - B_b + M * sel <= M - 1, tight M = max(B_a) - min(B_b) + 1.
+                cqm.add_constraint_from_iterable(
+                    sels + [(self.selector[(i, k, 6)], 1.0), (self.selector[(i, k, 7)], 1.0)], '>=', 1,
+                    label=(prefix, "separation_required", i, k)
+                )
+                for d, (name, k_first) in enumerate(_BIN_ORDERS, start=6):
+                    a, b = (k, i) if k_first else (i, k)
+                    m = float(rank[item_bins[a][-1]] - rank[item_bins[b][0]] + 1)
+                    cqm.add_constraint_from_iterable(
+                        bin_index[a] + [(v, -r) for v, r in bin_index[b]] + [(self.selector[(i, k, d)], m)],
+                        '<=', m - 1,
+                        label=(prefix, name, i, k)
+                    )
+
+
             # 2. Enforce the logic for each selector
-            # d=0: i left of k => x_i + len_i <= x_k
-            self.cqm.add_constraint(
-                self.x[i] + items[i].dims.length - self.x[k] <= M * (1 - self.selector[(i, k, 0)]),
-                label=f"sep_left_{i}_{k}"
-            )
-            # d=1: i right of k => x_k + len_k <= x_i
-            self.cqm.add_constraint(
-                self.x[k] + items[k].dims.length - self.x[i] <= M * (1 - self.selector[(i, k, 1)]),
-                label=f"sep_right_{i}_{k}"
-            )
-            # d=2: i behind k => y_i + wid_i <= y_k
-            self.cqm.add_constraint(
-                self.y[i] + items[i].dims.width - self.y[k] <= M * (1 - self.selector[(i, k, 2)]),
-                label=f"sep_behind_{i}_{k}"
-            )
-            # d=3: i front of k => y_k + wid_k <= y_i
-            self.cqm.add_constraint(
-                self.y[k] + items[k].dims.width - self.y[i] <= M * (1 - self.selector[(i, k, 3)]),
-                label=f"sep_front_{i}_{k}"
-            )
-            # d=4: i below k => z_i + hgt_i <= z_k
-            self.cqm.add_constraint(
-                self.z[i] + items[i].dims.height - self.z[k] <= M * (1 - self.selector[(i, k, 4)]),
-                label=f"sep_below_{i}_{k}"
-            )
-            # d=5: i above k => z_k + hgt_k <= z_i
-            self.cqm.add_constraint(
-                self.z[k] + items[k].dims.height - self.z[i] <= M * (1 - self.selector[(i, k, 5)]),
-                label=f"sep_above_{i}_{k}"
-            )
+            for d, m in enumerate(row):
+                name, axis, k_first = _SEPARATIONS[d]
+                a, b = (k, i) if k_first else (i, k)
+                coord = coords[axis]
+                cqm.add_constraint_from_iterable(
+                    ((coord[a], 1.0), (coord[b], -1.0), (self.selector[(i, k, d)], m)), '<=', upper_list[axis],
+                    label=(prefix, name, i, k)
+                )
+
+        # C4b. Symmetry breaking: identical copies in index order of their corner,
+        # compared lexicographically on (z, y, x) through the integer key
+        # x + (U_x + 1) * y + (U_x + 1) * (U_y + 1) * z. Not strict: copies in
+        # different bins may share a corner (in one bin they are separated anyway).
+        key_y, key_z = U_x + 1, (U_x + 1) * (U_y + 1)
+        for members in groups.values():
+            for i, k in zip(members, members[1:]):
+                cqm.add_constraint_from_iterable(
+                    ((self.x[i], 1.0), (self.y[i], key_y), (self.z[i], key_z),
+                     (self.x[k], -1.0), (self.y[k], -key_y), (self.z[k], -key_z)), '<=', 0,
+                    label=f"{prefix}item_{k}_after_item_{i}"
+                )
 
         # C5. Weight Constraint (From Day 2)
-        for j in range(num_bins):
-            bin_capacity = bins[j].max_weight
-            current_weight = quicksum(
-                self.bin_loc[i, j] * items[i].weight 
-                for i in range(num_items)
+        # weight_terms[j] is reused by C7 as the Total Weight in Bin j
+        weight_terms = {
+            j: self._build_weight_constraint(units[j], wt, bin_cap[j], f"{prefix}bin_{j}_weight_limit")
+            for j in kept
+        }
+
+        # C6. STACKABILITY (Day 3 Feature)
+        # The per-pair tests are applied as boolean masks over the pair arrays,
+        # so only the pairs that need a constraint are visited, without branching.
+        pairs = self.pairs
+        msw_i, msw_k = msw[I], msw[K]
+
+        # Case A: Fragility
+        # If item i is fragile, NOTHING can be above it.
+        # "Above" means selector[(i, k, 4)] (i below k) is 1.
+        for idx in np.flatnonzero(frag[I]).tolist():
+            i, k = pairs[idx]
+            cqm.add_constraint_from_iterable(
+                ((self.selector[(i, k, 4)], 1.0),), '==', 0,
+                label=(prefix, "fragile_cannot_support", i, k)
             )
-            self.cqm.add_constraint(
-                current_weight <= bin_capacity,
-                label=f"bin_{j}_weight_limit"
+        # (copies have no i-above-k selector: nothing to fix)
+        for idx in np.flatnonzero(frag[K] & ~copies).tolist():
+            i, k = pairs[idx]
+            cqm.add_constraint_from_iterable(
+                ((self.selector[(i, k, 5)], 1.0),), '==', 0, # i above k
+                label=(prefix, "fragile_cannot_support", k, i)
             )
 
-        # C6. STACKABILITY (Day 3 Feature)
-        for i, k in combinations(range(num_items), 2):
-            # Case A: Fragility
-            # If item i is fragile, NOTHING can be above it.
-            # "Above" means selector[(i, k, 4)] (i below k) is 1.
-            if items[i].is_fragile:
-                self.cqm.add_constraint(
-                    self.selector[(i, k, 4)] == 0,
-                    label=f"fragile_{i}_cannot_support_{k}"
-                )
-            if items[k].is_fragile:
-                self.cqm.add_constraint(
-                    self.selector[(i, k, 5)] == 0, # i above k
-                    label=f"fragile_{k}_cannot_support_{i}"
-                )
-                
-            # Case B: Load Bearing
-            # If i is below k, weight of k <= load_bearing of i
-            if items[i].max_stack_weight is not None:
-                # If i below k (sel=1), then weight_k <= limit
-                # weight_k * sel <= limit
-                self.cqm.add_constraint(
-                    items[k].weight * self.selector[(i, k, 4)] <= items[i].max_stack_weight,
-                    label=f"load_bearing_{i}_supports_{k}"
-                )
-            if items[k].max_stack_weight is not None:
-                # If k below i (sel=1 for i above k), then weight_i <= limit
-                self.cqm.add_constraint(
-                    items[i].weight * self.selector[(i, k, 5)] <= items[k].max_stack_weight,
-                    label=f"load_bearing_{k}_supports_{i}"
-                )
+        # Case B: Load Bearing
+        # If i is below k, weight of k <= load_bearing of i.
+        # weight_k * sel <= limit is either always true (weight_k <= limit: skipped)
+        # or forces sel = 0, which is emitted directly as a hard fix. The mask is
+        # False for NaN limits too (no max_stack_weight), so one test covers both.
+        for idx in np.flatnonzero(msw_i < wt[K]).tolist():
+            i, k = pairs[idx]
+            # i cannot be below k
+            cqm.add_constraint_from_iterable(
+                ((self.selector[(i, k, 4)], 1.0),), '==', 0,
+                label=(prefix, "load_bearing_supports", i, k)
+            )
+        for idx in np.flatnonzero((msw_k < wt[I]) & ~copies).tolist():
+            i, k = pairs[idx]
+            # k cannot be below i (i above k)
+            cqm.add_constraint_from_iterable(
+                ((self.selector[(i, k, 5)], 1.0),), '==', 0,
+                label=(prefix, "load_bearing_supports", k, i)
+            )
 
         # C7. ADVANCED LOGISTICS (Day 4: Axles & Balance)
-        for j in range(num_bins):
+        # Positions are in grid units: targets/tolerances are divided by the step and
+        # the rear axle lever arm is multiplied by it.
+        for j in kept:
             bin_obj = bins[j]
+            needs_cog = bool(bin_obj.center_of_gravity_target and bin_obj.cog_tolerance)
+            needs_axle = bool(bin_obj.wheelbase and bin_obj.axle_max_weight)
+            if not (needs_cog or needs_axle):
+                continue
+
+            # Total Weight in Bin j: sum_i w_i * bin_loc[i, j]
+            weight_j = weight_terms[j]
+
+            # Calculate Moment X (Weight * Position)
+            # Note: x[i] is the corner. CoG of item is x[i] + len/2.
+            moment_x_j = self._moment_terms(j, self.x, L, bin_items[j], wt)
             
             # Only apply if parameters are set
-            if bin_obj.center_of_gravity_target and bin_obj.cog_tolerance:
-                target_x, target_y = bin_obj.center_of_gravity_target
-                tol = bin_obj.cog_tolerance
-                
-                # Calculate Total Weight in Bin j
-                total_weight_j = quicksum(
-                    self.bin_loc[i, j] * items[i].weight 
-                    for i in range(num_items)
-                )
-                
-                # Calculate Moment X (Weight * Position)
-                # Note: x[i] is the corner. CoG of item is x[i] + len/2.
-                moment_x_j = quicksum(
-                    self.bin_loc[i, j] * items[i].weight * (self.x[i] + items[i].dims.length/2)
-                    for i in range(num_items)
-                )
+            if needs_cog:
+                target_x, target_y = (t / step for t in bin_obj.center_of_gravity_target)
+                tol = bin_obj.cog_tolerance / step
                 
                 # Constraint: |Moment / Weight - Target| <= Tol
                 # => Moment - (Target + Tol) * Weight <= 0
                 # => Moment - (Target - Tol) * Weight >= 0
-                
-                self.cqm.add_constraint(
-                    moment_x_j - (target_x + tol) * total_weight_j <= 0,
-                    label=f"cog_x_upper_bin_{j}"
+                cqm.add_constraint_from_iterable(
+                    moment_x_j + [(v, -(target_x + tol) * w) for v, w in weight_j], '<=', 0,
+                    label=f"{prefix}cog_x_upper_bin_{j}"
                 )
-                self.cqm.add_constraint(
-                    moment_x_j - (target_x - tol) * total_weight_j >= 0,
-                    label=f"cog_x_lower_bin_{j}"
+                cqm.add_constraint_from_iterable(
+                    moment_x_j + [(v, -(target_x - tol) * w) for v, w in weight_j], '>=', 0,
+                    label=f"{prefix}cog_x_lower_bin_{j}"
                 )
                 
                 # Same for Y (Lateral Balance)
-                moment_y_j = quicksum(
-                    self.bin_loc[i, j] * items[i].weight * (self.y[i] + items[i].dims.width/2)
-                    for i in range(num_items)
-                )
-                self.cqm.add_constraint(
-                    moment_y_j - (target_y + tol) * total_weight_j <= 0,
-                    label=f"cog_y_upper_bin_{j}"
+                moment_y_j = self._moment_terms(j, self.y, W, bin_items[j], wt)
+                cqm.add_constraint_from_iterable(
+                    moment_y_j + [(v, -(target_y + tol) * w) for v, w in weight_j], '<=', 0,
+                    label=f"{prefix}cog_y_upper_bin_{j}"
                 )
-                self.cqm.add_constraint(
-                    moment_y_j - (target_y - tol) * total_weight_j >= 0,
-                    label=f"cog_y_lower_bin_{j}"
+                cqm.add_constraint_from_iterable(
+                    moment_y_j + [(v, -(target_y - tol) * w) for v, w in weight_j], '>=', 0,
+                    label=f"{prefix}cog_y_lower_bin_{j}"
                 )
 
             # Axle Weights (Requires Wheelbase)
-            if bin_obj.wheelbase and bin_obj.axle_max_weight:
+            if needs_axle:
                 wb = bin_obj.wheelbase
                 max_axle = bin_obj.axle_max_weight
                 
-                # Re-calculate Moment X and Total Weight (or reuse if we could, but variables are cheap)
-                total_weight_j = quicksum(
-                    self.bin_loc[i, j] * items[i].weight 
-                    for i in range(num_items)
-                )
-                moment_x_j = quicksum(
-                    self.bin_loc[i, j] * items[i].weight * (self.x[i] + items[i].dims.length/2)
-                    for i in range(num_items)
-                )
-                
                 # Rear Axle Load = Moment_X / Wheelbase
                 # (Assuming X=0 is Front Axle. If X=0 is front wall and front axle is offset, we'd adjust)
                 # Let's assume X=0 is the Front Axle position for simplicity of Day 4.
-                rear_axle_load = moment_x_j / wb
+                rear_axle_load = [(*t[:-1], t[-1] * step / wb) for t in moment_x_j]
                 
                 # Front Axle Load = Total Weight - Rear Axle Load
-                front_axle_load = total_weight_j - rear_axle_load
+                front_axle_load = weight_j + [(*t[:-1], -t[-1]) for t in rear_axle_load]
                 
-                self.cqm.add_constraint(
-                    rear_axle_load <= max_axle,
-                    label=f"axle_rear_limit_bin_{j}"
+                cqm.add_constraint_from_iterable(
+                    rear_axle_load, '<=', max_axle,
+                    label=f"{prefix}axle_rear_limit_bin_{j}"
                 )
-                self.cqm.add_constraint(
-                    front_axle_load <= max_axle,
-                    label=f"axle_front_limit_bin_{j}"
+                cqm.add_constraint_from_iterable(
+                    front_axle_load, '<=', max_axle,
+                    label=f"{prefix}axle_front_limit_bin_{j}"
                 )
 
         # --- Objective ---
         # Minimize number of bins used
-        self.cqm.set_objective(quicksum(self.bin_on[j] for j in range(num_bins)))
+        return [(self.bin_on[j], 1.0) for j in kept]
+
+    def _ffd_solution(self, placement: List[Tuple[int, Tuple[int, int, int]]], item_dims: np.ndarray,
+                      I: np.ndarray, K: np.ndarray) -> Dict[str, int]:
+        """
+        The FFD shelf packing as a sample over the variables of the current build:
+        bin assignment, bin usage, copy counts and grid corners, plus every selector
+        whose separation holds between the FFD corners or bins, e.g.
+        selector[(i, k, 0)] = 1 iff x_i + len_i <= x_k.
+
+        The shelf layout separates every pair in a shared bin along at least one
+        axis. Balance and stackability are not considered, so the sample may still
+        violate C6/C7.
+        """
+        bin_of = [j for j, _ in placement]
+        corners = np.array([c for _, c in placement], dtype=np.int64).reshape(-1, 3)
+        sample = {loc: int(bin_of[i] == j) for (i, j), loc in self.bin_loc.items()}
+        used = set(bin_of)
+        sample.update((on, int(j in used)) for j, on in self.bin_on.items())
+        sample.update(
+            (label, sum(bin_of[i] == j for i in self.groups[g])) for (g, j), label in self.count.items()
+        )
+        for axis, coord in enumerate((self.x, self.y, self.z)):
+            sample.update(zip(coord.values(), corners[:, axis].tolist()))
+
+        # Low corner + extent of the first item vs low corner of the second, per direction
+        ends = corners + item_dims
+        for d, (_, axis, k_first) in enumerate(_SEPARATIONS):
+            a, b = (K, I) if k_first else (I, K)
+            holds = (ends[a, axis] <= corners[b, axis]).tolist()
+            sample.update(
+                (self.selector[(i, k, d)], int(h))
+                for i, k, h in zip(I.tolist(), K.tolist(), holds) if (i, k, d) in self.selector
+            )
+        # Bin order: kept bins are ranked by request index
+        bins = np.array(bin_of, dtype=np.int64)
+        for d, (_, k_first) in enumerate(_BIN_ORDERS, start=6):
+            a, b = (K, I) if k_first else (I, K)
+            holds = (bins[a] < bins[b]).tolist()
+            sample.update(
+                (self.selector[(i, k, d)], int(h))
+                for i, k, h in zip(I.tolist(), K.tolist(), holds) if (i, k, d) in self.selector
+            )
+        return sample
+
+    def _build_weight_constraint(self, units: List[Tuple[str, int]], weights: np.ndarray,
+                                 capacity: float, label: str) -> List[Tuple[str, float]]:
+        """
+        C5 for one bin: sum_i w_i * bin_loc[i, j] <= capacity, with copy counts
+        weighing their group once. `units` holds (variable, item it stands for)
+        pairs. Assembled with a single add_linear_from call over the label/weight
+        arrays. Returns the weight terms.
+        """
+        labels = [v for v, _ in units]
+        terms = list(zip(labels, weights[[i for _, i in units]].tolist()))
+        qm = QuadraticModel()
+        qm.add_variables_from_model(self.cqm, variables=labels)
+        qm.add_linear_from(terms)
+        self.cqm.add_constraint_from_model(qm, '<=', capacity, label=label, copy=False)
+        return terms
+
+    def _moment_terms(self, j: int, coord: Dict[int, str], extents: np.ndarray,
+                      members: List[int], weights: np.ndarray) -> List[tuple]:
+        """
+        Bias terms of sum_i w_i * (coord[i] + extent_i/2) * bin_loc[i, j] for bin j:
+        quadratic (coord[i], bin_loc[i, j], w_i) triples plus linear bin_loc offsets.
+        """
+        locs = [self.bin_loc[i, j] for i in members]
+        w = weights[members]
+        return (
+            list(zip([coord[i] for i in members], locs, w.tolist()))
+            + list(zip(locs, (w * extents[members] / 2).tolist()))
+        )
         
     def solve(self) -> Dict:
         """
-        Submits to D-Wave Leap.
+        Submits to D-Wave Leap and blocks until the result is back. Safe to call
+        from inside a running event loop (Jupyter, async handlers).
         """
-        print("Submitting to D-Wave Leap...")
-        sampleset = self.sampler.sample_cqm(self.cqm, time_limit=self.time_limit)
-        feasible = sampleset.filter(lambda d: d.is_feasible)
-        
-        if len(feasible) == 0:
-            return {"status": "Infeasible", "solution": None}
-            
-        best = feasible.first.sample
-        return {"status": "Optimal", "solution": best}
+        logger.info("Submitting to D-Wave Leap...")
+        sampleset = self._sample(f"pack-{uuid.uuid4()}", self.cqm, self._warm_start)
+        return self._result(sampleset, self._coord_step)
+
+    async def solve_async(self) -> Dict:
+        """
+        Submits to D-Wave Leap without blocking the event loop: the network wait runs
+        in the default thread pool. The model, grid steps and warm start are captured
+        at the call, so meanwhile the caller can reset() and build the next CQM on
+        this solver (reset() swaps in a fresh model; building without it would extend
+        the one in flight).
+        """
+        logger.info("Submitting to D-Wave Leap...")
+        cqm, coord_step, warm_start = self.cqm, self._coord_step, self._warm_start
+        loop = asyncio.get_running_loop()
+        sampleset = await loop.run_in_executor(None, self._sample, f"pack-{uuid.uuid4()}", cqm, warm_start)
+        return self._result(sampleset, coord_step)
+
+    def _result(self, sampleset, coord_step: Dict[str, float]) -> Dict:
+        """
+        Status, source and decoded best feasible sample of a resolved sampleset.
+        """
+        record = sampleset.record
+        feasible = np.flatnonzero(record.is_feasible)
+
+        if feasible.size == 0:
+            return self._outcome(None, None)
+
+        # Lowest energy; on ties the Leap samples (listed first) win over the FFD one
+        best = feasible[np.argmin(record.energy[feasible])]
+        sample = dict(zip(sampleset.variables, record.sample[best].tolist()))
+        return self._outcome(_sources(sampleset)[best], self._decode(sample, coord_step))
+
+    @staticmethod
+    def _outcome(source: Optional[str], solution: Optional[Dict]) -> Dict:
+        """
+        Result dict for the best sample's source: "leap" is reported as "Optimal";
+        "ffd", the greedy warm start that no Leap sample beat, only as "Feasible".
+        """
+        if solution is None:
+            return {"status": "Infeasible", "source": None, "solution": None}
+        status = "Optimal" if source == "leap" else "Feasible"
+        return {"status": status, "source": source, "solution": solution}
+
+    def _decode(self, sample, coord_step: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Converts a raw sample to a plain dict with coordinates back in meters, using
+        the grid steps of the current model unless `coord_step` is given.
+        """
+        solution = dict(sample)
+        for label, step in (self._coord_step if coord_step is None else coord_step).items():
+            solution[label] = solution[label] * step
+        return solution
+
+    def batch_solve(self, requests: List[PackingRequest]) -> List[Dict]:
+        """
+        Solves independent requests with a single Leap submission.
+
+        Each request is built under its own `req{r}_` label prefix into one
+        block-diagonal CQM with the objectives summed. The blocks share no variables,
+        so each request then takes its own best sample, judged on its own constraints
+        and objective only: an infeasible request never costs the others their result.
+        Starts from a fresh model (reset()); afterwards the per-build attributes such
+        as bin_loc and pairs describe the last request.
+        """
+        self.reset()
+        prefixes = [f"req{r}_" for r in range(len(requests))]
+        objectives = [self._build_for_prefix(prefix, request) for prefix, request in zip(prefixes, requests)]
+        self.cqm.set_objective([term for objective in objectives for term in objective])
+
+        logger.info("Submitting to D-Wave Leap...")
+        sampleset = self._sample(f"pack-{uuid.uuid4()}", self.cqm, self._warm_start)
+        return [
+            self._request_result(sampleset, prefix, objective)
+            for prefix, objective in zip(prefixes, objectives)
+        ]
+
+    def _request_result(self, sampleset, prefix: str, objective: List[Tuple[str, float]]) -> Dict:
+        """
+        Status and decoded best sample of the batch request under `prefix`, with the
+        prefix stripped from the solution labels.
+        """
+        labels = [
+            c for c in self.cqm.constraints
+            if (c[0] == prefix if isinstance(c, tuple) else c.startswith(prefix))
+        ]
+        best, best_energy, best_source = None, None, None
+        for sample, source in zip(sampleset.samples(), _sources(sampleset)):
+            # Same tolerance as SampleSet.from_samples_cqm
+            if any(v > 1e-6 for _, v in self.cqm.iter_violations(sample, clip=True, labels=labels)):
+                continue
+            energy = sum(bias * sample[v] for v, bias in objective)
+            if best is None or energy < best_energy:
+                best, best_energy, best_source = sample, energy, source
+
+        if best is None:
+            return self._outcome(None, None)
+        solution = self._decode(best)
+        return self._outcome(
+            best_source, {k[len(prefix):]: v for k, v in solution.items() if k.startswith(prefix)}
+        )
+
+    def _sample(self, label: str, cqm: ConstrainedQuadraticModel, warm_start: Optional[Dict[str, int]]):
+        """
+        Blocking submission of `cqm`; resolves the (lazy) sampleset so the wait
+        happens here. Reads no model state from self, so it can run in a worker
+        thread while self is rebuilt.
+
+        The FFD warm start is passed as an initial state when the solver accepts one,
+        and is always appended to the returned samples as a fallback candidate; the
+        `source` vector tells the Leap samples ("leap") from it ("ffd").
+        """
+        sampler = self._get_sampler()
+        min_time_limit = sampler.min_time_limit(cqm)
+        time_limit = min_time_limit if self.stop_on_first else self.time_limit
+        if time_limit < min_time_limit:
+            raise ValueError(
+                f"the minimum time limit for this problem is {min_time_limit} seconds "
+                f"({time_limit}s provided)"
+            )
+        kwargs = {"time_limit": time_limit, "label": label}
+        if warm_start and "initial_states" in sampler.parameters:
+            kwargs["initial_states"] = [warm_start]
+        # sample_cqm serializes the model once (cqm.to_file) and uploads that file
+        # handle, after checking it against the solver's size limits
+        sampleset = sampler.sample_cqm(cqm, **kwargs)
+        sampleset.resolve()
+        if warm_start:
+            # Re-scored as one array: the returned and FFD samples may differ in dtype
+            labels = sampleset.variables
+            samples = sampleset.record.sample
+            warm = np.array([[warm_start[v] for v in labels]])
+            sampleset = SampleSet.from_samples_cqm(
+                (np.vstack([samples, warm.astype(np.result_type(samples, warm))]), labels),
+                cqm, info=dict(sampleset.info), source=["leap"] * len(samples) + ["ffd"],
+            )
+        return sampleset
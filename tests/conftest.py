@@ -0,0 +1,12 @@
+import pytest
+
+from src.solver import EnterpriseSolver
+
+
+@pytest.fixture(scope="session")
+def solver():
+    """
+    One solver per test process; cached_solve resets its model before each build.
+    The tests only check feasibility: run for Leap's minimum time, not a fixed limit.
+    """
+    return EnterpriseSolver(stop_on_first=True)
@@ -0,0 +1,48 @@
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+from src.domain_models import PackingRequest
+from src.solver import EnterpriseSolver
+
+# Under the repo's .pytest_cache (git-ignored, wiped by `pytest --cache-clear`)
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".pytest_cache" / "solver"
+
+# Solver and model sources are part of the key, so editing the formulation or the
+# request validation/defaults invalidates the cache
+_SOLVER_SOURCES = tuple(
+    Path(__file__).resolve().parent.parent / "src" / name
+    for name in ("solver.py", "_cqm_build.py", "domain_models.py")
+)
+
+
+def cached_solve(request: PackingRequest, solver: EnterpriseSolver, key_extra: str = "") -> dict:
+    """
+    Solves `request` with `solver`, memoized on disk between test runs.
+
+    The key is the SHA-256 of the canonical JSON of the request, the solver settings,
+    the solver sources and `key_extra` (bump it to force a re-solve). Only results
+    with a solution are stored, so a failed run is retried next time.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(request.model_dump(mode="json"), sort_keys=True).encode())
+    digest.update(json.dumps([solver.time_limit, solver.stop_on_first, solver.STEP]).encode())
+    for source in _SOLVER_SOURCES:
+        digest.update(source.read_bytes())
+    digest.update(key_extra.encode())
+    path = CACHE_DIR / f"{digest.hexdigest()}.pkl"
+    if path.exists():
+        return pickle.loads(path.read_bytes())
+
+    solver.reset()
+    solver.build_model(request)
+    result = solver.solve()
+    if result["solution"] is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename: parallel xdist workers never read a partial file
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(pickle.dumps(result))
+        tmp.replace(path)
+    return result
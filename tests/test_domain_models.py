@@ -0,0 +1,41 @@
+import pytest
+
+from src.domain_models import Item, Bin, PackingRequest, Dimensions
+
+
+def _request(weight=10.0):
+    return PackingRequest(
+        items=[Item(id="box", dims=Dimensions(length=1, width=1, height=1), weight=weight)],
+        bins=[Bin(id="van", dims=Dimensions(length=2, width=2, height=2), max_weight=100.0)],
+    )
+
+
+def test_request_equality_ignores_cached_arrays():
+    """
+    Requests compare by their fields, also once the dimension arrays are cached.
+    """
+    a, b = _request(), _request()
+    a.bin_dims_array, b.bin_dims_array, a.item_dims_array, b.item_dims_array
+    assert a == b
+    assert a != _request(weight=5.0)
+
+
+def test_request_is_immutable():
+    """
+    Item and bin lists are stored as tuples, so the cached arrays cannot go stale.
+    """
+    request = _request()
+    assert isinstance(request.items, tuple) and isinstance(request.bins, tuple)
+    with pytest.raises(AttributeError):
+        request.items.append(request.items[0])
+
+
+def test_from_dict_ignores_unknown_keys():
+    """
+    Extra keys in a JSON payload are dropped, as with pydantic's extra='ignore'.
+    """
+    dims = {"length": 1, "width": 1, "height": 1, "unit": "m"}
+    item = Item.from_dict({"id": "box", "dims": dims, "weight": 10.0, "sku": "A-1"})
+    assert item == Item(id="box", dims=Dimensions(length=1, width=1, height=1), weight=10.0)
+    van = Bin.from_dict({"id": "van", "dims": dims, "max_weight": 100.0, "plate": "XY-12"})
+    assert van.dims == Dimensions(length=1, width=1, height=1)
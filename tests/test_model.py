@@ -0,0 +1,309 @@
+"""
+Offline tests of the CQM formulation: models are built without Leap, and
+hand-made placements are checked against them with cqm.violations.
+"""
+import asyncio
+import threading
+from unittest import mock
+
+import numpy as np
+import pytest
+from dimod import SampleSet
+
+from src.domain_models import Item, Bin, PackingRequest, Dimensions
+from src.solver import EnterpriseSolver, _to_grid, _upper_bound_bins
+
+
+def _build(request):
+    solver = EnterpriseSolver()
+    solver.build_model(request)
+    return solver
+
+
+def _placed(solver, request, placement):
+    """
+    Full sample of the built model for `placement[i] = (bin, (x, y, z) in meters)`.
+    """
+    step = next(iter(solver._coord_step.values()))
+    item_dims = _to_grid(request.item_dims_array, step, up=True)
+    grid = [(j, tuple(int(round(c / step)) for c in corner)) for j, corner in placement]
+    I, K = np.array(solver.pairs, dtype=np.int64).reshape(-1, 2).T
+    return solver._ffd_solution(grid, item_dims, I, K)
+
+
+def _feasible(solver, sample):
+    return not any(v > 1e-6 for _, v in solver.cqm.iter_violations(sample, clip=True))
+
+
+class FakeSampler:
+    """
+    Stands in for LeapHybridCQMSampler: returns the all-zero sample, so any
+    feasible result is the appended FFD warm start.
+    """
+    parameters = {}
+    properties = {}
+
+    def min_time_limit(self, cqm):
+        return 5.0
+
+    def sample_cqm(self, cqm, time_limit=None, **kwargs):
+        return SampleSet.from_samples_cqm([{v: 0 for v in cqm.variables}], cqm)
+
+
+class EchoSampler(FakeSampler):
+    """
+    Returns its initial states: a Leap run that finds nothing better than FFD.
+    """
+    parameters = {"initial_states": []}
+
+    def sample_cqm(self, cqm, time_limit=None, initial_states=(), **kwargs):
+        return SampleSet.from_samples_cqm(list(initial_states), cqm)
+
+
+_INFEASIBLE = {"status": "Infeasible", "source": None, "solution": None}
+
+
+@pytest.fixture
+def fake_sampler():
+    with mock.patch.object(EnterpriseSolver, "_sampler", FakeSampler()):
+        yield
+
+
+def _box(id, side, **kwargs):
+    return Item(id=id, dims=Dimensions(length=side, width=side, height=side), weight=10.0, **kwargs)
+
+
+def _easy():
+    return PackingRequest(
+        items=[_box("box", 1)],
+        bins=[Bin(id="van", dims=Dimensions(length=2, width=2, height=2), max_weight=100.0)],
+    )
+
+
+def _axle_overload():
+    # 60 kg on two axles of 20 kg each: no placement balances it
+    return PackingRequest(
+        items=[Item(id="load", dims=Dimensions(length=2, width=2, height=2), weight=60.0)],
+        bins=[Bin(id="truck", dims=Dimensions(length=10, width=10, height=10), max_weight=100.0,
+                  wheelbase=10.0, axle_max_weight=20.0)],
+    )
+
+
+def test_exact_fit_is_kept():
+    """
+    An item that fits the bin in meters fits the model, also when rounding its
+    extents to the grid makes it one step too large: it is pinned to the wall.
+    """
+    van = Bin(id="van", dims=Dimensions(length=1.22, width=1.02, height=2.0), max_weight=1000.0)
+    for length in (1.22, 1.21):
+        request = PackingRequest(
+            items=[Item(id="pallet", dims=Dimensions(length=length, width=1.02, height=1.0), weight=100.0)],
+            bins=[van],
+        )
+        solver = _build(request)
+        assert set(solver._coord_step.values()) == {EnterpriseSolver.STEP}
+        assert solver.cqm.check_feasible(solver._warm_start)
+        assert solver._decode(solver._warm_start)["x_0"] == 0.0
+        moved = dict(solver._warm_start, x_0=1)
+        assert not _feasible(solver, moved)
+
+
+def test_grid():
+    """
+    Items round up and bins round down.
+    """
+    assert _to_grid([[0.15, 0.1, 0.31]], 0.05, up=True).tolist() == [[3, 2, 7]]
+    assert _to_grid([[0.15, 0.1, 0.31]], 0.05, up=False).tolist() == [[3, 2, 6]]
+
+
+def test_ffd_bound():
+    """
+    FFD opens a bin per item that does not fit the previous ones; no items, no bins.
+    """
+    empty = np.zeros((0, 3), dtype=np.int64)
+    assert _upper_bound_bins(empty, np.zeros(0), np.array([[2, 2, 2]]), np.array([10.0])) == (0, [])
+
+    item_dims = np.array([[2, 2, 2], [2, 2, 2]])
+    M_hat, placement = _upper_bound_bins(item_dims, np.array([1.0, 1.0]), np.array([[2, 2, 2]] * 3), np.full(3, 10.0))
+    assert M_hat == 2
+    assert sorted(j for j, _ in placement) == [0, 1]
+
+    M_hat, placement = _upper_bound_bins(item_dims, np.array([1.0, 1.0]), np.array([[1, 1, 1]]), np.array([10.0]))
+    assert (M_hat, placement) == (1, None)
+
+
+def test_warm_start_is_feasible():
+    """
+    The FFD packing is a feasible sample of the model it bounds.
+    """
+    request = PackingRequest(
+        items=[_box("big", 3), _box("a", 1), _box("b", 1), _box("c", 2)],
+        bins=[Bin(id=f"van-{j}", dims=Dimensions(length=4, width=4, height=3), max_weight=100.0) for j in range(3)],
+    )
+    solver = _build(request)
+    assert solver._warm_start is not None
+    assert _feasible(solver, solver._warm_start)
+
+
+def test_items_can_leave_their_ffd_bin():
+    """
+    FFD fills the small bin first and needs two bins; both items fit the big one.
+    """
+    request = PackingRequest(
+        items=[_box("a", 5), _box("b", 2)],
+        bins=[Bin(id="small", dims=Dimensions(length=5, width=5, height=5), max_weight=100.0),
+              Bin(id="big", dims=Dimensions(length=10, width=10, height=10), max_weight=100.0)],
+    )
+    solver = _build(request)
+    sample = _placed(solver, request, [(1, (0, 0, 0)), (1, (5, 0, 0))])
+    assert _feasible(solver, sample)
+    assert sum(sample[v] for v in solver.bin_on.values()) == 1
+
+
+def test_bins_beyond_ffd_count():
+    """
+    FFD uses the two small bins; only identical bins past that count are dropped,
+    so the single big bin stays and can take both items.
+    """
+    small = dict(dims=Dimensions(length=5, width=5, height=5), max_weight=100.0)
+    request = PackingRequest(
+        items=[_box("a", 5), _box("b", 5)],
+        bins=[Bin(id=f"small-{j}", **small) for j in range(3)]
+             + [Bin(id="big", dims=Dimensions(length=10, width=10, height=10), max_weight=100.0)],
+    )
+    solver = _build(request)
+    assert sorted(solver.bin_on) == [0, 1, 3]
+    assert _feasible(solver, _placed(solver, request, [(3, (0, 0, 0)), (3, (5, 0, 0))]))
+
+
+def test_rules_keep_every_bin():
+    """
+    Two fragile cubes cannot stack, so they need both towers although FFD uses one.
+    """
+    tower = dict(dims=Dimensions(length=10, width=10, height=20), max_weight=100.0)
+    request = PackingRequest(
+        items=[_box("f0", 10, is_fragile=True), _box("f1", 10, is_fragile=True)],
+        bins=[Bin(id="tower-0", **tower), Bin(id="tower-1", **tower)],
+    )
+    solver = _build(request)
+    assert len(solver.bin_on) == 2
+    assert not _feasible(solver, _placed(solver, request, [(0, (0, 0, 0)), (0, (0, 0, 10))]))
+    assert _feasible(solver, _placed(solver, request, [(0, (0, 0, 0)), (1, (0, 0, 0))]))
+
+
+def test_separation_by_bin_order():
+    """
+    A pair sharing many bins gets one separation row plus bin-order selectors,
+    not one row per bin; overlapping in one bin is still cut off.
+    """
+    tower = dict(dims=Dimensions(length=10, width=10, height=20), max_weight=100.0)
+    request = PackingRequest(
+        items=[_box("f0", 10, is_fragile=True), _box("f1", 10, is_fragile=True)],
+        bins=[Bin(id=f"tower-{j}", **tower) for j in range(5)],
+    )
+    solver = _build(request)
+    labels = [c for c in solver.cqm.constraints if isinstance(c, tuple) and c[1] == "separation_required"]
+    assert labels == [("", "separation_required", 0, 1)]
+    assert _feasible(solver, _placed(solver, request, [(0, (0, 0, 0)), (1, (0, 0, 0))]))
+    assert _feasible(solver, _placed(solver, request, [(1, (0, 0, 0)), (0, (0, 0, 0))]))
+    assert not _feasible(solver, _placed(solver, request, [(0, (0, 0, 0)), (0, (0, 0, 0))]))
+
+
+def test_copies_in_corner_order():
+    """
+    Identical items take their corners in (z, y, x) order: the swap is cut off.
+    """
+    request = PackingRequest(
+        items=[_box("a", 2), _box("b", 2)],
+        bins=[Bin(id="van", dims=Dimensions(length=4, width=2, height=2), max_weight=100.0)],
+    )
+    solver = _build(request)
+    assert _feasible(solver, _placed(solver, request, [(0, (0, 0, 0)), (0, (2, 0, 0))]))
+    assert not _feasible(solver, _placed(solver, request, [(0, (2, 0, 0)), (0, (0, 0, 0))]))
+
+
+def test_copy_counts():
+    """
+    C5 weighs the copies of a group in a bin through one count, which follows
+    their bin assignments.
+    """
+    request = PackingRequest(
+        items=[_box("a", 1), _box("b", 1), _box("c", 1), _box("big", 2)],
+        bins=[Bin(id="van", dims=Dimensions(length=4, width=4, height=4), max_weight=35.0),
+              Bin(id="truck", dims=Dimensions(length=4, width=4, height=5), max_weight=100.0)],
+    )
+    solver = _build(request)
+    assert set(solver.cqm.constraints["bin_0_weight_limit"].lhs.variables) == {"count_0_in_bin_0", "item_3_in_bin_0"}
+    sample = _placed(solver, request, [(0, (0, 0, 0)), (0, (1, 0, 0)), (1, (2, 0, 0)), (0, (2, 0, 0))])
+    assert _feasible(solver, sample)
+    assert (sample["count_0_in_bin_0"], sample["count_0_in_bin_1"]) == (2, 1)
+    # 3 copies and the big box weigh 40 kg
+    assert not _feasible(solver, _placed(solver, request, [(0, (0, 0, 0)), (0, (1, 0, 0)), (0, (0, 1, 0)), (0, (2, 0, 0))]))
+
+
+def test_solve(fake_sampler):
+    """
+    solve() keeps the best feasible sample and returns coordinates in meters.
+    """
+    request = PackingRequest(
+        items=[Item(id="crate", dims=Dimensions(length=0.4, width=0.3, height=0.3), weight=5.0)],
+        bins=[Bin(id="van", dims=Dimensions(length=1.2, width=0.8, height=1.0), max_weight=100.0)],
+    )
+    solver = _build(request)
+    result = solver.solve()
+    assert (result["status"], result["source"]) == ("Feasible", "ffd")
+    assert result["solution"]["bin_0_used"] == 1
+    assert (result["solution"]["x_0"], result["solution"]["z_0"]) == (0.0, 0.0)
+
+    solver = _build(_axle_overload())
+    assert solver.solve() == _INFEASIBLE
+
+
+def test_leap_sample_preferred_over_ffd():
+    """
+    A Leap sample as good as the FFD fallback is reported as Leap's, as Optimal.
+    """
+    solver = _build(_easy())
+    with mock.patch.object(EnterpriseSolver, "_sampler", EchoSampler()):
+        result = solver.solve()
+    assert (result["status"], result["source"]) == ("Optimal", "leap")
+
+
+def test_solve_async_while_rebuilding():
+    """
+    The solver can be reset and rebuilt while a solve_async call is in flight:
+    the result still belongs to the model that was submitted.
+    """
+    gate = threading.Event()
+
+    class GatedSampler(FakeSampler):
+        def sample_cqm(self, cqm, time_limit=None, **kwargs):
+            gate.wait(10)
+            return super().sample_cqm(cqm, time_limit, **kwargs)
+
+    async def run():
+        solver = _build(_easy())
+        task = asyncio.create_task(solver.solve_async())
+        await asyncio.sleep(0)
+        solver.reset()
+        solver.build_model(_axle_overload())
+        gate.set()
+        return await task
+
+    with mock.patch.object(EnterpriseSolver, "_sampler", GatedSampler()):
+        result = asyncio.run(run())
+    assert result["source"] == "ffd"
+    assert result["solution"]["bin_0_used"] == 1
+
+
+def test_batch_solve(fake_sampler):
+    """
+    Each request of a batch gets its own result, with the prefix stripped; a model
+    built before does not leak into the batch.
+    """
+    solver = _build(_easy())
+    easy, overloaded = solver.batch_solve([_easy(), _axle_overload()])
+    assert (easy["status"], easy["source"]) == ("Feasible", "ffd")
+    assert easy["solution"] == {"bin_0_used": 1, "item_0_in_bin_0": 1, "x_0": 0.0, "y_0": 0.0, "z_0": 0.0}
+    assert overloaded == _INFEASIBLE
+    assert all(v.startswith("req") for v in solver.cqm.variables)